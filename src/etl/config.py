@@ -1,14 +1,89 @@
 from typing import Any
 
 
+# Optional per-table reader settings:
+#   'dtype': column -> type name, so the CSV reader skips type inference for those columns.
+#   'parse_dates': columns read directly as timestamps.
+#   'categories': low-cardinality string columns read dictionary-encoded, arriving as 'category'.
+#   'usecols': the subset of columns to read; all columns are read when omitted.
+#   'newlines_in_values': set when quoted values may contain line breaks (slower to parse).
 TABLES_CONFIG: list[dict[str, Any]] = [
-    {'table_name': 'customers', 'file_path': 'bronze/olist_customers_dataset.csv'},
-    {'table_name': 'geolocation', 'file_path': 'bronze/olist_geolocation_dataset.csv'},
-    {'table_name': 'order_items', 'file_path': 'bronze/olist_order_items_dataset.csv'},
-    {'table_name': 'order_payments', 'file_path': 'bronze/olist_order_payments_dataset.csv'},
-    {'table_name': 'order_reviews', 'file_path': 'bronze/olist_order_reviews_dataset.csv'},
-    {'table_name': 'orders', 'file_path': 'bronze/olist_orders_dataset.csv'},
-    {'table_name': 'products', 'file_path': 'bronze/olist_products_dataset.csv'},
-    {'table_name': 'sellers', 'file_path': 'bronze/olist_sellers_dataset.csv'},
-    {'table_name': 'product_category_name_translation', 'file_path': 'bronze/product_category_name_translation.csv'}
-]
\ No newline at end of file
+    {
+        'table_name': 'customers',
+        'file_path': 'bronze/olist_customers_dataset.csv',
+        'dtype': {
+            'customer_id': 'string', 'customer_unique_id': 'string', 'customer_zip_code_prefix': 'int32',
+        },
+        'categories': ['customer_city', 'customer_state'],
+    },
+    {
+        'table_name': 'geolocation',
+        'file_path': 'bronze/olist_geolocation_dataset.csv',
+        'dtype': {
+            'geolocation_zip_code_prefix': 'int32', 'geolocation_lat': 'float64', 'geolocation_lng': 'float64',
+        },
+        'categories': ['geolocation_state'],
+        # The city is not part of the aggregated lookup table, so it is never parsed.
+        'usecols': [
+            'geolocation_zip_code_prefix', 'geolocation_lat', 'geolocation_lng', 'geolocation_state',
+        ],
+    },
+    {
+        'table_name': 'order_items',
+        'file_path': 'bronze/olist_order_items_dataset.csv',
+        'dtype': {
+            'order_id': 'string', 'order_item_id': 'int32', 'product_id': 'string', 'seller_id': 'string',
+            'price': 'float64', 'freight_value': 'float64',
+        },
+        'parse_dates': ['shipping_limit_date'],
+    },
+    {
+        'table_name': 'order_payments',
+        'file_path': 'bronze/olist_order_payments_dataset.csv',
+        'dtype': {
+            'order_id': 'string', 'payment_sequential': 'int32', 'payment_type': 'string',
+            'payment_installments': 'int32', 'payment_value': 'float64',
+        },
+    },
+    {
+        'table_name': 'order_reviews',
+        'file_path': 'bronze/olist_order_reviews_dataset.csv',
+        'dtype': {
+            'review_id': 'string', 'order_id': 'string', 'review_score': 'int32',
+            'review_comment_title': 'string', 'review_comment_message': 'string',
+        },
+        'parse_dates': ['review_creation_date', 'review_answer_timestamp'],
+        'newlines_in_values': True,
+    },
+    {
+        'table_name': 'orders',
+        'file_path': 'bronze/olist_orders_dataset.csv',
+        'dtype': {'order_id': 'string', 'customer_id': 'string', 'order_status': 'string'},
+        'parse_dates': [
+            'order_purchase_timestamp', 'order_approved_at', 'order_delivered_carrier_date',
+            'order_delivered_customer_date', 'order_estimated_delivery_date',
+        ],
+    },
+    {
+        'table_name': 'products',
+        'file_path': 'bronze/olist_products_dataset.csv',
+        'dtype': {
+            'product_id': 'string', 'product_category_name': 'string', 'product_name_lenght': 'float64',
+            'product_description_lenght': 'float64', 'product_photos_qty': 'float64', 'product_weight_g': 'float64',
+            'product_length_cm': 'float64', 'product_height_cm': 'float64', 'product_width_cm': 'float64',
+        },
+    },
+    {
+        'table_name': 'sellers',
+        'file_path': 'bronze/olist_sellers_dataset.csv',
+        'dtype': {
+            'seller_id': 'string', 'seller_zip_code_prefix': 'int32',
+        },
+        'categories': ['seller_city', 'seller_state'],
+    },
+    {
+        'table_name': 'product_category_name_translation',
+        'file_path': 'bronze/product_category_name_translation.csv',
+        'dtype': {'product_category_name': 'string', 'product_category_name_english': 'string'},
+    },
+]
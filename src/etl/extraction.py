@@ -1,27 +1,162 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import os
 
+
+# --- CSV Reader Constants ---
+# Large blocks let pyarrow split each file across several parser threads.
+READ_BLOCK_SIZE = 64 << 20
+# Type used for the columns listed under a table's 'parse_dates'.
+TIMESTAMP_TYPE = 'timestamp[s]'
+# Type used for the columns listed under a table's 'categories'; pandas receives them as 'category'.
+DICTIONARY_TYPE = pa.dictionary(pa.int32(), pa.string())
+# Arrow strings stay Arrow-backed in pandas instead of becoming Python objects.
+ARROW_STRING_DTYPES = {
+    pa.string(): pd.StringDtype('pyarrow'),
+    pa.large_string(): pd.StringDtype('pyarrow'),
+}
+
+
+def _read_csv(config: dict[str, Any]) -> pd.DataFrame | None:
+    """
+    Reads a single table's source file with pyarrow's multi-threaded CSV parser.
+
+    Args:
+        config: A dict defining a table, its source file and optional reader settings
+            ('dtype', 'parse_dates', 'categories', 'usecols', 'newlines_in_values').
+
+    Returns:
+        The extracted pandas DataFrame, or None if the source file does not exist.
+    """
+    table_name = config['table_name']
+    file_path = config['file_path']
+
+    if not os.path.exists(file_path):
+        print(f"Error: File not found for table {table_name} at {file_path}")
+        return None
+
+    # Declared types skip the reader's type inference for those columns
+    numeric_types = {col: type_name for col, type_name in config.get('dtype', {}).items() if type_name != 'string'}
+    date_cols = config.get('parse_dates', [])
+
+    column_types = dict(config.get('dtype', {}))
+    column_types.update({col: TIMESTAMP_TYPE for col in date_cols})
+    column_types.update({col: DICTIONARY_TYPE for col in config.get('categories', [])})
+
+    # Numeric columns re-read as text, converted after the pandas conversion
+    coerced_types = {}
+    try:
+        table = _read_arrow_table(file_path, config, column_types)
+    except pa.ArrowInvalid:
+        if not numeric_types and not date_cols:
+            raise
+
+        # A value does not match its declared type. The numeric and date columns are re-read as
+        # text instead: malformed numbers are coerced to missing values below, and malformed dates
+        # become NaT in the transforms' datetime casting.
+        print(f"⚠️ Warning: Malformed values in table {table_name}; coercing its typed columns.")
+        column_types.update({col: 'string' for col in [*numeric_types, *date_cols]})
+        table = _read_arrow_table(file_path, config, column_types)
+        coerced_types = numeric_types
+
+    # Date-only columns become datetime64 rather than objects, so string columns only hold strings.
+    # The table is not used afterwards, so its buffers are released column by column while converting.
+    df = table.to_pandas(
+        date_as_object=False,
+        types_mapper=ARROW_STRING_DTYPES.get,
+        split_blocks=True,
+        self_destruct=True,
+    )
+
+    for col, type_name in coerced_types.items():
+        if col in df.columns:
+            df[col] = _coerce_numeric(df[col], type_name)
+
+    return df
+
+
+def _read_arrow_table(file_path: str, config: dict[str, Any], column_types: dict[str, Any]) -> pa.Table:
+    """
+    Parses a CSV file into an Arrow table with the given column types.
+
+    Args:
+        file_path: The CSV file to read.
+        config: The table's config, for the 'usecols' and 'newlines_in_values' settings.
+        column_types: The Arrow type of each declared column.
+
+    Returns:
+        The parsed Arrow table.
+
+    Raises:
+        pa.ArrowInvalid: If a value cannot be converted to its column's declared type.
+    """
+    read_options = pacsv.ReadOptions(use_threads=True, block_size=READ_BLOCK_SIZE)
+    parse_options = pacsv.ParseOptions(newlines_in_values=config.get('newlines_in_values', False))
+    # Empty fields are read as nulls in string columns too, as pd.read_csv does.
+    convert_options = pacsv.ConvertOptions(
+        column_types=column_types,
+        include_columns=config.get('usecols'),
+        strings_can_be_null=True,
+    )
+
+    return pacsv.read_csv(
+        file_path, read_options=read_options, parse_options=parse_options, convert_options=convert_options
+    )
+
+
+def _coerce_numeric(series: pd.Series, type_name: str) -> pd.Series:
+    """
+    Converts a text column to its declared numeric type, turning malformed values into missing values.
+
+    Integer columns with missing values use pandas' nullable integer type of the same width.
+    Fractional or out-of-range values in an integer column count as malformed.
+
+    Args:
+        series: The column read as text.
+        type_name: The declared numeric type (e.g. 'int32', 'float64').
+
+    Returns:
+        The numeric column.
+    """
+    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+    if pd.api.types.is_integer_dtype(type_name):
+        info = np.iinfo(type_name)
+        invalid = ~np.isfinite(values) | (values != np.trunc(values)) | (values < info.min) | (values > info.max)
+        if invalid.any():
+            values[invalid] = np.nan
+            type_name = f"{'UInt' if info.min == 0 else 'Int'}{info.bits}"
+
+    return pd.Series(values, index=series.index, name=series.name).astype(type_name)
+
+
 def extract_data(tables_config: list[dict[str, Any]]) -> dict[str,  pd.DataFrame]:
     """
     Extracts data for all tables defined in the configuration.
 
+    The source files are independent, so they are read concurrently; pyarrow releases the
+    GIL while parsing.
+
     Args:
         tables_config: A list of dicts, each defining a table and its source file.
 
     Returns:
         A dictionary mapping table names to their extracted pandas DataFrame.
     """
-    extracted_data = {}
-    for config in tables_config:
-        table_name = config['table_name']
-        file_path = config['file_path']
+    if not tables_config:
+        return {}
 
-        if not os.path.exists(file_path):
-            print(f"Error: File not found for table {table_name} at {file_path}")
-            continue
+    max_workers = min(len(tables_config), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        dataframes = executor.map(_read_csv, tables_config)
 
-        df = pd.read_csv(file_path)
-        extracted_data[table_name] = df
+        extracted_data = {}
+        for config, df in zip(tables_config, dataframes):
+            if df is not None:
+                extracted_data[config['table_name']] = df
 
-    return extracted_data
\ No newline at end of file
+    return extracted_data
@@ -1,14 +1,150 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable
+import io
 import os
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from psycopg2.extras import execute_values
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+
+
+# --- Bulk Load Constants ---
+# Rows sent per COPY statement. Large batches amortize the per-statement overhead.
+COPY_CHUNKSIZE = 100_000
+# COPY reads headerless CSV; Arrow writes nulls as empty fields and empty strings as "".
+COPY_CSV_OPTIONS = pacsv.WriteOptions(include_header=False)
+# Rows per multi-row INSERT statement when COPY is unavailable.
+INSERT_PAGE_SIZE = 10_000
+# Tables loaded concurrently, each on its own pooled connection.
+LOAD_POOL_SIZE = 4
+
+
+def _create_table_if_missing(df: pd.DataFrame, table_name: str, connection: Connection):
+    """
+    Creates the target table from the DataFrame's schema if it does not exist yet, mirroring the
+    behaviour of `to_sql(if_exists='append')` without inserting any rows.
+
+    Args:
+        df: The DataFrame whose schema defines the table.
+        table_name: The target table name.
+        connection: An open SQLAlchemy connection.
+    """
+    df.head(0).to_sql(table_name, connection, if_exists='append', index=False)
+
+
+def _copy_dataframe(df: pd.DataFrame, table_name: str, connection: Connection, chunksize: int = COPY_CHUNKSIZE):
+    """
+    Bulk loads a DataFrame into a table using PostgreSQL's COPY FROM STDIN.
+
+    The table is created from the DataFrame's schema if it does not exist yet. The DataFrame is
+    then converted to Arrow once and each record batch is serialized by Arrow's C++ CSV writer
+    and streamed to the server, which avoids both the per-row INSERT round-trips of `to_sql`
+    and pandas' Python-level CSV formatting.
+
+    Args:
+        df: The DataFrame to load.
+        table_name: The target table name.
+        connection: An open SQLAlchemy connection; the caller owns the transaction.
+        chunksize: The number of rows sent per COPY statement.
+    """
+    _create_table_if_missing(df, table_name, connection)
+
+    columns = ', '.join(f'"{col}"' for col in df.columns)
+    copy_sql = f'COPY "{table_name}" ({columns}) FROM STDIN WITH (FORMAT CSV)'
+
+    # Arrow writes floats in their shortest round-trip form (integral values without a
+    # trailing '.0', which integer columns would reject) and decodes categoricals.
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    cursor = connection.connection.cursor()
+    try:
+        for batch in table.to_batches(max_chunksize=chunksize):
+            buffer = io.BytesIO()
+            pacsv.write_csv(batch, buffer, write_options=COPY_CSV_OPTIONS)
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+    finally:
+        cursor.close()
+
+
+def _insert_dataframe(
+        df: pd.DataFrame,
+        table_name: str,
+        connection: Connection,
+        chunksize: int = COPY_CHUNKSIZE,
+        page_size: int = INSERT_PAGE_SIZE
+):
+    """
+    Loads a DataFrame into a table with batched multi-row INSERTs (psycopg2's `execute_values`).
+
+    Fallback for servers or proxies where COPY FROM STDIN is not available. Each statement carries
+    `page_size` rows, so far fewer statements are sent than with `to_sql`.
+
+    Args:
+        df: The DataFrame to load.
+        table_name: The target table name.
+        connection: An open SQLAlchemy connection; the caller owns the transaction.
+        chunksize: The number of rows converted to Python tuples at a time.
+        page_size: The number of rows per INSERT statement.
+    """
+    _create_table_if_missing(df, table_name, connection)
+
+    columns = ', '.join(f'"{col}"' for col in df.columns)
+    insert_sql = f'INSERT INTO "{table_name}" ({columns}) VALUES %s'
+
+    cursor = connection.connection.cursor()
+    try:
+        for start in range(0, len(df), chunksize):
+            # Python objects with None for missing values, which psycopg2 sends as NULL
+            chunk = df.iloc[start:start + chunksize].astype(object)
+            chunk = chunk.where(chunk.notna(), None)
+            rows = list(chunk.itertuples(index=False, name=None))
+            execute_values(cursor, insert_sql, rows, page_size=page_size)
+    finally:
+        cursor.close()
+
+
+def _load_table(
+        engine: Engine,
+        load_func: Callable[[pd.DataFrame, str, Connection], None],
+        table_name: str,
+        df: pd.DataFrame
+) -> Exception | None:
+    """
+    Loads one DataFrame in its own transaction.
+
+    Args:
+        engine: The SQLAlchemy engine to take a connection from.
+        load_func: The loader to use (`_copy_dataframe` or `_insert_dataframe`).
+        table_name: The target table name.
+        df: The DataFrame to load.
+
+    Returns:
+        The exception raised while loading, or None if the table was loaded.
+    """
+    try:
+        with engine.begin() as connection:
+            load_func(df, table_name, connection)
+    except Exception as e:
+        return e
+
+    return None
+
 
 def load_data(dataframes: dict[str, pd.DataFrame]):
     """
     Loads transformed DataFrames into a PostgreSQL database in the correct order.
 
     This function retrieves database credentials from environment variables, creates a
-    SQLAlchemy engine, and then iterates through a predefined load order to ensure
-    relational integrity (parent tables before child tables).
+    SQLAlchemy engine, and then loads every table once the tables its foreign keys point
+    to are loaded, to ensure relational integrity (parent tables before child tables).
+    Independent tables are loaded concurrently, each in its own transaction, so a failed
+    table does not discard the others.
+
+    Rows are sent with COPY by default. Setting `ETL_LOAD_METHOD=insert` switches to
+    batched INSERT statements for databases where COPY is not available.
 
     Args:
         dataframes: A dictionary of table names to their transformed DataFrames.
@@ -25,44 +161,64 @@ def load_data(dataframes: dict[str, pd.DataFrame]):
         return
 
     # 2. Create the database connection engine
-    connection_string = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-    engine = create_engine(connection_string)
+    # psycopg2 is named explicitly: the COPY and INSERT helpers use its cursor API.
+    connection_string = f"postgresql+psycopg2://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+    engine = create_engine(connection_string, pool_size=LOAD_POOL_SIZE)
+
+    load_method = os.getenv("ETL_LOAD_METHOD", "copy")
+    if load_method not in ("copy", "insert"):
+        print(f"Error: Unknown ETL_LOAD_METHOD '{load_method}'. Expected 'copy' or 'insert'.")
+        return
+    load_func = _insert_dataframe if load_method == "insert" else _copy_dataframe
 
-    # 3. Define load order to respect foreign key constraints
+    # 3. Define load dependencies to respect foreign key constraints
     # Parent tables must be loaded before their dependent child tables.
-    LOAD_ORDER = [
-        'customers',
-        'geolocation',
-        'sellers',
-        'product_category_name_translation',
-        'products',
-        'orders', # Depends on 'customers'
-        'order_items', # Depends on 'orders', 'products', 'sellers'
-        'order_payments', # Depends on 'orders'
-        'order_reviews' # Depends on 'orders'
-    ]
+    LOAD_DEPENDENCIES = {
+        'customers': set(),
+        'geolocation': set(),
+        'sellers': set(),
+        'product_category_name_translation': set(),
+        'products': {'product_category_name_translation'},
+        'orders': {'customers'},
+        'order_items': {'orders', 'products', 'sellers'},
+        'order_payments': {'orders'},
+        'order_reviews': {'orders'},
+    }
 
     # 4. Load dataframes into SQL tables
     print("--- Starting Data Load ---")
-    for table_name in LOAD_ORDER:
+    pending = {}
+    for table_name, dependencies in LOAD_DEPENDENCIES.items():
         if table_name in dataframes:
-            df = dataframes[table_name]
-            print(f"Loading {len(df)} rows into '{table_name}'...")
-            try:
-                # Using 'append' to avoid overwriting existing data.
-                # 'chunksize' processes the DataFrame in batches to manage memory.
-                df.to_sql(
-                    table_name,
-                    engine,
-                    if_exists='append',
-                    index=False,
-                    chunksize=1000
-                )
-                print(f"✅ Success: '{table_name}' loaded.")
-            except Exception as e:
-                print(f"❌ Error loading data into '{table_name}': {e}")
-                # Optional: break the loop if a critical table fails to load
-                # break
+            pending[table_name] = dependencies
         else:
             print(f"⚠️ Warning: DataFrame for table '{table_name}' not found in input.")
-    print("--- Data Load Complete ---")
\ No newline at end of file
+
+    # Tables are finished once attempted, whether they loaded or failed; missing tables never block.
+    finished = set(LOAD_DEPENDENCIES) - set(pending)
+
+    with ThreadPoolExecutor(max_workers=LOAD_POOL_SIZE) as executor:
+        running = {}
+        while pending or running:
+            # Schedule every table whose parents are all finished
+            ready = [table_name for table_name, dependencies in pending.items() if dependencies <= finished]
+            for table_name in ready:
+                del pending[table_name]
+                df = dataframes[table_name]
+                print(f"Loading {len(df)} rows into '{table_name}'...")
+                future = executor.submit(_load_table, engine, load_func, table_name, df)
+                running[future] = table_name
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                table_name = running.pop(future)
+                finished.add(table_name)
+
+                error = future.result()
+                if error is None:
+                    print(f"✅ Success: '{table_name}' loaded.")
+                else:
+                    print(f"❌ Error loading data into '{table_name}': {error}")
+
+    engine.dispose()
+    print("--- Data Load Complete ---")
@@ -1,5 +1,11 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
-from utils import _sanitize_dataframe, _set_category_type, _clean_string_columns
+import os
+from utils import (
+    _clean_string_columns_fused, _set_category_type, _set_known_categories, _group_mode, _group_means, _parse_datetimes,
+    _days_between, _downcast_numerics, BR_STATES,
+)
 
 
 # --- Specific Table Transformations ---
@@ -18,7 +24,7 @@ def _transform_customers(df: pd.DataFrame) -> pd.DataFrame:
         The transformed customer DataFrame with optimized dtypes.
     """
     # Security & Cleaning
-    df = _clean_string_columns(_sanitize_dataframe(df))
+    df = _clean_string_columns_fused(df)
 
     # Rename column names
     COLUMN_MAPPING = {
@@ -31,7 +37,9 @@ def _transform_customers(df: pd.DataFrame) -> pd.DataFrame:
     df.rename(columns=COLUMN_MAPPING, inplace=True)
 
     # Type Optimization  for Categorical Identifiers
+    df['state'] = _set_known_categories(df['state'], BR_STATES)
     df = _set_category_type(df)
+    df = _downcast_numerics(df)
 
     # 5. Handle potential null values, although not required for this dataset.
 
@@ -51,20 +59,22 @@ def _transform_geolocation(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         The aggregated and cleaned geolocation lookup DataFrame.
     """
-    # Security & Cleaning
-    df = _clean_string_columns(_sanitize_dataframe(df))
-
-    # Initial Type Optimization (Improves groupby performance)
-    df = _set_category_type(df)
+    # Only these columns survive the aggregation, so the city is never cleaned
+    df = df.loc[:, ['geolocation_zip_code_prefix', 'geolocation_lat', 'geolocation_lng', 'geolocation_state']]
 
+    # Security & Cleaning
+    df = _clean_string_columns_fused(df)
 
     # 2. Aggregation: Create the final one-to-one lookup table
+    # The integer zip code prefix is the grouping key; the state arrives categorical from extraction.
     # Group by the zip code prefix and calculate the mean lat/lng
-    agg_df = df.groupby('geolocation_zip_code_prefix', observed=True).agg(
-        avg_lat=('geolocation_lat', 'mean'),
-        avg_lng=('geolocation_lng', 'mean'),
-        state_mode=('geolocation_state', lambda x: x.mode()[0] if not x.mode().empty else None),
-    ).reset_index()
+    agg_df = _group_means(df, 'geolocation_zip_code_prefix', ['geolocation_lat', 'geolocation_lng'])
+    agg_df.rename(columns={'geolocation_lat': 'avg_lat', 'geolocation_lng': 'avg_lng'}, inplace=True)
+
+    # The most frequent state per prefix is computed separately to avoid a Python call per group
+    state_mode = _group_mode(df, 'geolocation_zip_code_prefix', 'geolocation_state')
+    state_mode = state_mode.rename(columns={'geolocation_state': 'state_mode'})
+    agg_df = agg_df.merge(state_mode, on='geolocation_zip_code_prefix', how='left')
 
     # Rename column names
     COLUMN_MAPPING = {
@@ -76,7 +86,10 @@ def _transform_geolocation(df: pd.DataFrame) -> pd.DataFrame:
     agg_df.rename(columns=COLUMN_MAPPING, inplace=True)
 
     # Final Type Optimization on the new aggregated DataFrame
-    agg_df = _set_category_type(agg_df)
+    # There is one row per prefix, so no category scan is run: the state is moved onto the known
+    # state categories and the prefix is downcast as an integer key.
+    agg_df['state'] = _set_known_categories(agg_df['state'], BR_STATES)
+    agg_df = _downcast_numerics(agg_df)
 
     return agg_df
 
@@ -92,10 +105,14 @@ def _transform_order_items(df: pd.DataFrame) -> pd.DataFrame:
         The cleaned order items DataFrame.
     """
     # Security & Cleaning
-    df = _clean_string_columns(_sanitize_dataframe(df))
+    df = _clean_string_columns_fused(df)
+
+    # Datetime Casting
+    df = _parse_datetimes(df, ['shipping_limit_date'])
 
     # Initial Type Optimization (Improves groupby performance)
     df = _set_category_type(df)
+    df = _downcast_numerics(df)
 
     # Rename column names
     COLUMN_MAPPING = {
@@ -124,20 +141,20 @@ def _transform_order_payments(df: pd.DataFrame) -> pd.DataFrame:
         The transformed and aggregated DataFrame ready for joining with te 'orders' table.
     """
     # Security & Cleaning
-    df = _clean_string_columns(_sanitize_dataframe(df))
-    # Initial Type Optimization
-    if 'payment_type' in df.columns:
-        df['payment_type'] = df['payment_type'].astype('category')
+    df = _clean_string_columns_fused(df)
 
     # Aggregation: Summarize payments to the Order level (one row per 'order_id')
-    agg_df = df.groupby('order_id', observed=True).agg(
+    agg_df = df.groupby('order_id', observed=True, sort=False).agg(
         total_payment_value=('payment_value', 'sum'),
         max_installments=('payment_installments', 'max'),
         payment_chunk_count=('payment_sequential', 'count'),
-        # Determine the primary payment type by frequency (mode)
-        main_payment_type=('payment_type', lambda x: x.mode()[0] if not x.mode().empty else None)
     ).reset_index()
 
+    # Determine the primary payment type by frequency (mode)
+    main_payment_type = _group_mode(df, 'order_id', 'payment_type')
+    main_payment_type = main_payment_type.rename(columns={'payment_type': 'main_payment_type'})
+    agg_df = agg_df.merge(main_payment_type, on='order_id', how='left')
+
     # Renaming
     COLUMN_MAPPING = {
         'order_id': 'id',
@@ -147,7 +164,8 @@ def _transform_order_payments(df: pd.DataFrame) -> pd.DataFrame:
     }
     agg_df.rename(columns=COLUMN_MAPPING, inplace=True)
 
-    agg_df = _set_category_type(df)
+    agg_df = _set_category_type(agg_df)
+    agg_df = _downcast_numerics(agg_df)
 
     return agg_df
 
@@ -165,13 +183,11 @@ def _transform_order_reviews(df: pd.DataFrame) -> pd.DataFrame:
         The transformed and aggregated DataFrame ready for joining with the 'orders' table.
     """
     # 1. Security & Cleaning (Sanitize and clean all string columns)
-    df = _clean_string_columns(_sanitize_dataframe(df))
+    df = _clean_string_columns_fused(df)
 
     # 2. Datetime Casting
     date_cols = ['review_creation_date', 'review_answer_timestamp']
-    existing_date_cols = [col for col in date_cols if col in df.columns]
-    if existing_date_cols:
-        df[existing_date_cols] = df[existing_date_cols].apply(pd.to_datetime, errors='coerce')
+    df = _parse_datetimes(df, date_cols)
 
     # Handle Null comments
     text_cols = ['review_comment_title', 'review_comment_message']
@@ -180,7 +196,7 @@ def _transform_order_reviews(df: pd.DataFrame) -> pd.DataFrame:
         df[existing_text_cols] = df[existing_text_cols].fillna('')
 
     # Aggregation to Order Level
-    agg_df = df.groupby('order_id', observed=True).agg(
+    agg_df = df.groupby('order_id', observed=True, sort=False).agg(
         review_count=('review_id', 'count'),
         avg_review_score=('review_score', 'mean'),
         latest_review_date=('review_creation_date', 'max'),
@@ -199,6 +215,7 @@ def _transform_order_reviews(df: pd.DataFrame) -> pd.DataFrame:
 
     # 5. Final Type Optimization
     agg_df = _set_category_type(agg_df)
+    agg_df = _downcast_numerics(agg_df)
 
     return agg_df
 
@@ -218,7 +235,7 @@ def _transform_orders(df: pd.DataFrame) -> pd.DataFrame:
         The transformed 'orders' DataFrame with optimized types and new features.
     """
     # 1. Standard Cleaning & Initial Type Optimization
-    df = _clean_string_columns(_sanitize_dataframe(df))
+    df = _clean_string_columns_fused(df)
 
     # 2. Safe Datetime Casting
     date_cols = [
@@ -228,9 +245,7 @@ def _transform_orders(df: pd.DataFrame) -> pd.DataFrame:
         'order_delivered_customer_date',
         'order_estimated_delivery_date'
     ]
-    existing_date_cols = [col for col in date_cols if col in df.columns]
-    if existing_date_cols:
-        df[existing_date_cols] = df[existing_date_cols].apply(pd.to_datetime, errors='coerce')
+    df = _parse_datetimes(df, date_cols)
 
     # 3. Renaming (Done before feature engineering for cleaner access)
     COLUMN_MAPPING = {
@@ -247,14 +262,15 @@ def _transform_orders(df: pd.DataFrame) -> pd.DataFrame:
 
     # 4. Feature Engineering: Calculate time deltas in days
     # These metrics are crucial for business intelligence and performance analysis.
-    # The .dt.days accessor correctly handles NaT (missing dates) by producing NaN.
-    df['delivery_time_days'] = (df['customer_delivery'] - df['purchase']).dt.days
-    df['approval_time_days'] = (df['approved'] - df['purchase']).dt.days
+    # Missing dates (NaT) produce <NA> in the nullable integer results.
+    df['delivery_time_days'] = _days_between(df['customer_delivery'], df['purchase'])
+    df['approval_time_days'] = _days_between(df['approved'], df['purchase'])
 
     # Negative values indicate a late delivery.
-    df['delivery_lateness_days'] = (df['estimated_delivery'] - df['customer_delivery']).dt.days
+    df['delivery_lateness_days'] = _days_between(df['estimated_delivery'], df['customer_delivery'])
 
     df = _set_category_type(df)
+    df = _downcast_numerics(df)
 
     return df
 
@@ -273,10 +289,15 @@ def _transform_products(df: pd.DataFrame) -> pd.DataFrame:
         The transformed 'products' DataFrame.
     """
     # 1. Standard Cleaning
-    df = _clean_string_columns(_sanitize_dataframe(df))
+    df = _clean_string_columns_fused(df)
 
     # 2. Feature Engineering: Calculate volume before imputing nulls
-    df['product_volume_cm3'] = df['product_length_cm'] * df['product_height_cm'] * df['product_width_cm']
+    # Multiplying the raw arrays in place into a single output buffer skips the index alignment of
+    # Series arithmetic and the intermediate array of `length * height`.
+    volume = df['product_length_cm'].to_numpy(dtype='float64', copy=True)
+    np.multiply(volume, df['product_height_cm'].to_numpy(), out=volume)
+    np.multiply(volume, df['product_width_cm'].to_numpy(), out=volume)
+    df['product_volume_cm3'] = volume
 
     # 3. Handle Missing Values
     # Impute the few missing dimensional metrics with the median for robustness.
@@ -284,10 +305,10 @@ def _transform_products(df: pd.DataFrame) -> pd.DataFrame:
         'product_weight_g', 'product_length_cm', 'product_height_cm',
         'product_width_cm', 'product_volume_cm3'
     ]
-    for col in dimensional_cols:
-        if col in df.columns:
-            median_val = df[col].median()
-            df[col].fillna(median_val)
+    existing_dimensional_cols = [col for col in dimensional_cols if col in df.columns]
+    if existing_dimensional_cols:
+        medians = df[existing_dimensional_cols].median().to_dict()
+        df[existing_dimensional_cols] = df[existing_dimensional_cols].fillna(medians)
 
     # Fill missing category with a placeholder; it's a feature, not a metric.
     if 'product_category_name' in df.columns:
@@ -320,6 +341,7 @@ def _transform_products(df: pd.DataFrame) -> pd.DataFrame:
 
     # 6. Final Type Optimization for IDs and categorical features
     df = _set_category_type(df)
+    df = _downcast_numerics(df)
 
     return df
 
@@ -338,7 +360,7 @@ def _transform_sellers(df: pd.DataFrame) -> pd.DataFrame:
         The transformed 'sellers' DataFrame.
     """
     # 1. Standard Cleaning
-    df = _clean_string_columns(_sanitize_dataframe(df))
+    df = _clean_string_columns_fused(df)
 
     # 2. Renaming
     COLUMN_MAPPING = {
@@ -350,7 +372,9 @@ def _transform_sellers(df: pd.DataFrame) -> pd.DataFrame:
     df.rename(columns=COLUMN_MAPPING, inplace=True)
 
     # 3. Final Type Optimization
+    df['state'] = _set_known_categories(df['state'], BR_STATES)
     df = _set_category_type(df)
+    df = _downcast_numerics(df)
 
     return df
 
@@ -369,7 +393,7 @@ def _transform_category_translation(df: pd.DataFrame) -> pd.DataFrame:
         The transformed DataFrame.
     """
     # 1. Standard Cleaning (Crucial for reliable joins)
-    df = _clean_string_columns(_sanitize_dataframe(df))
+    df = _clean_string_columns_fused(df)
 
     # 2. Renaming
     COLUMN_MAPPING = {
@@ -380,6 +404,7 @@ def _transform_category_translation(df: pd.DataFrame) -> pd.DataFrame:
 
     # 3. Final Type Optimization
     df = _set_category_type(df)
+    df = _downcast_numerics(df)
 
     return df
 
@@ -389,14 +414,16 @@ def transform_data(extracted_data: dict[str, pd.DataFrame]) -> dict[str, pd.Data
     Orchestrates all Silver Layer transformations across the extracted DataFrames using
     a Function Dispatch Table for maintainability and scalability (OCP).
 
+    The tables are independent, so each transformation runs in its own worker process. The input
+    dictionary is consumed: each raw DataFrame is removed from it as soon as it is handed to a
+    worker, so the parent process does not keep the raw tables alive.
+
     Args:
          extracted_data: A dictionary mapping table names to their raw pandas DataFrame.
 
     Returns:
         A dictionary mapping table names to their transformed pandas DataFrame.
     """
-    transformed_data = extracted_data.copy()
-
     # -- FUNCTION DISPATCH TABLE --
     # Maps table names to their specific transformation function.
     TRANSFORMATION_MAP = {
@@ -411,13 +438,28 @@ def transform_data(extracted_data: dict[str, pd.DataFrame]) -> dict[str, pd.Data
         'product_category_name_translation': _transform_category_translation
     }
 
-    for table_name, df in transformed_data.items():
-        if table_name in TRANSFORMATION_MAP:
-            transform_func = TRANSFORMATION_MAP[table_name]
+    table_names = list(extracted_data)
+    transformed_data = {}
+
+    n_tasks = sum(1 for table_name in table_names if table_name in TRANSFORMATION_MAP)
+    max_workers = max(1, min(n_tasks, os.cpu_count() or 1))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for table_name in table_names:
+            df = extracted_data.pop(table_name)
+
+            if table_name in TRANSFORMATION_MAP:
+                transform_func = TRANSFORMATION_MAP[table_name]
+
+                print(f"Applying Silver Layer to: {table_name}")
+                futures[table_name] = executor.submit(transform_func, df)
+            else:
+                print(f"No transformation applied for {table_name}")
+                transformed_data[table_name] = df
 
-            print(f"Applying Silver Layer to: {table_name}")
-            transformed_data[table_name] = transform_func(df)
-        else:
-            print(f"No transformation applied for {table_name}")
+        for table_name, future in futures.items():
+            transformed_data[table_name] = future.result()
 
-    return transformed_data
+    # Keep the input's table order
+    return {table_name: transformed_data[table_name] for table_name in table_names}
@@ -1,83 +1,419 @@
 import re
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from typing import Union
 
 
-def _sanitize_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+# Characters used in common injection attacks, compiled once for all columns.
+# Arrow's regex kernel takes the pattern as a string, so `_clean_arrow` passes `.pattern`.
+_SANITIZE_RE = re.compile(r'[";\'`()\[\]\{\}<>\-#]')
+# The same characters as a deletion table for single values: `str.translate` drops them in one C-level
+# pass, without going through the regex engine.
+_SANITIZE_TABLE = str.maketrans('', '', '";\'`()[]{}<>-#')
+
+# Dtypes holding text: numpy object columns and pandas string columns (e.g. 'string[pyarrow]').
+STRING_DTYPES = ['object', 'string']
+# String columns are cleaned as Arrow-backed strings so they can go through Arrow compute kernels.
+ARROW_STRING_DTYPE = pd.StringDtype('pyarrow')
+
+
+def _sanitize_strings(value):
+    """
+    Strips dangerous characters used in common injection attacks from a single value.
+
+    Args:
+        value: The value to sanitize.
+
+    Returns:
+        The sanitized string, or the value unchanged if it is missing or not a string.
+    """
+    # Missing values (None, NaN, pd.NA) are not strings either
+    if not isinstance(value, str):
+        return value
+    return value.translate(_SANITIZE_TABLE)
+
+
+def _clean_arrow(series: pd.Series) -> pd.Series:
+    """
+    Sanitizes, lowercases and strips a string Series in one chain of Arrow compute kernels.
+
+    Equivalent to `series.str.replace(...).str.lower().str.strip()`, but the intermediate results
+    stay Arrow arrays instead of being wrapped back into a pandas Series at every step.
+
+    Args:
+        series: The Arrow-backed string Series to clean.
+
+    Returns:
+        The cleaned 'string[pyarrow]' Series.
+    """
+    values = pa.array(series)
+    values = pc.replace_substring_regex(values, _SANITIZE_RE.pattern, '')
+    values = pc.utf8_trim_whitespace(pc.utf8_lower(values))
+
+    return pd.Series(pd.arrays.ArrowStringArray(values), index=series.index, name=series.name)
+
+
+def _string_columns(df: pd.DataFrame) -> list[str]:
     """
-    Strips dangerous characters used in common injection attacks from all columns of type object in a DataFrame.
-    This is a basic, proactive security measure for raw DatFrames.
+    Lists the string columns of a DataFrame.
+
+    Reads `df.dtypes` once instead of going through `select_dtypes`.
 
     Args:
         df: The input DataFrame.
 
     Returns:
-        The sanitized DataFrame.
+        The names of the columns whose dtype is in STRING_DTYPES.
+    """
+    return [col for col, dtype in df.dtypes.items() if dtype.name in STRING_DTYPES]
+
+
+def _to_arrow_strings(df: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
     """
-    def _sanitize_value(s):
-        if pd.isna(s) or not isinstance(s, str):
-            return s
-        return re.sub(r'[";\'`()\[\]\{\}<>\-\-#]', '', s)
+    Converts the given string columns to Arrow-backed 'string[pyarrow]'.
 
-    for col in df.select_dtypes(include=["object"]).columns:
-        df[col] = df[col].apply(_sanitize_value)
+    Columns that are already Arrow-backed are left untouched, so this is free for frames coming
+    from `extract_data`.
+
+    Args:
+        df: The input DataFrame.
+        cols: The string columns to convert.
+
+    Returns:
+        The DataFrame with the columns stored as 'string[pyarrow]'.
+    """
+    to_cast = [col for col in cols if df[col].dtype != ARROW_STRING_DTYPE]
+    if to_cast:
+        df[to_cast] = df[to_cast].astype(ARROW_STRING_DTYPE)
 
     return df
 
 
-def _clean_string_columns(df: pd.DataFrame) -> pd.DataFrame:
+def _categorical_string_columns(df: pd.DataFrame) -> list[str]:
     """
-    Takes a DataFrame and cleans its string columns by converting them
-    to lowercase and removing leading/trailing whitespace.
+    Lists the categorical columns of a DataFrame whose categories are strings.
 
     Args:
-         df: The input DataFrame.
+        df: The input DataFrame.
 
     Returns:
-        The cleaned DataFrame.
+        The names of the categorical columns with string categories.
+    """
+    return [
+        col for col, dtype in df.dtypes.items()
+        if isinstance(dtype, pd.CategoricalDtype) and pd.api.types.is_string_dtype(dtype.categories.dtype)
+    ]
+
+
+def _clean_string_columns_fused(df: pd.DataFrame) -> pd.DataFrame:
     """
-    df_cleaned = df.copy()
+    Sanitizes and cleans the string columns of a DataFrame in a single pass per column.
 
-    string_cols = df_cleaned.select_dtypes(include='object').columns
+    Dangerous characters used in common injection attacks are stripped, then the values are
+    lowercased and stripped of leading/trailing whitespace. Each column is replaced once instead of
+    once per step. Categorical string columns are cleaned through their categories.
+
+    Args:
+         df: The input DataFrame.
+
+    Returns:
+        The sanitized and cleaned DataFrame.
+    """
+    string_cols = _string_columns(df)
+    df = _to_arrow_strings(df, string_cols)
 
     for col in string_cols:
-        df_cleaned[col] = df_cleaned[col].str.lower().str.strip()
+        df[col] = _clean_arrow(df[col])
+
+    for col in _categorical_string_columns(df):
+        df[col] = _clean_category_column(df[col])
+
+    return df
+
+
+def _clean_category_column(series: pd.Series) -> pd.Series:
+    """
+    Sanitizes and cleans a categorical string Series by operating on its categories only.
+
+    The work is proportional to the number of categories rather than the number of rows. Categories
+    that become equal after cleaning (e.g. 'SP' and ' sp') are merged into one.
+
+    Args:
+        series: The categorical Series with string categories.
+
+    Returns:
+        The cleaned categorical Series, with sorted categories.
+    """
+    # Only the (few) distinct values are touched, so the scalar sanitizer is cheap here.
+    # Categories decoded from Arrow dictionaries are objects; they are stored as Arrow strings.
+    categories = series.cat.categories
+    # An all-null column has no categories and nothing to clean
+    if len(categories) == 0:
+        return series
+
+    cleaned = categories.map(_sanitize_strings).astype(ARROW_STRING_DTYPE).str.lower().str.strip()
+
+    # Re-factorize the cleaned categories to merge duplicates, then remap every row's code
+    category_codes, new_categories = pd.factorize(cleaned, sort=True)
+    codes = series.cat.codes.to_numpy()
+    new_codes = np.where(codes >= 0, category_codes[codes], -1)
+
+    return pd.Series(
+        pd.Categorical.from_codes(new_codes, categories=new_categories),
+        index=series.index,
+        name=series.name,
+    )
+
+
+def _group_mode(df: pd.DataFrame, by: str, col: str) -> pd.DataFrame:
+    """
+    Computes the most frequent value of a column for each group without a per-group Python call.
+
+    Ties are broken by the smallest value, matching `Series.mode()[0]`. Groups where the column is
+    entirely null are omitted.
+
+    Args:
+        df: The input DataFrame.
+        by: The column to group by.
+        col: The column whose mode is computed.
+
+    Returns:
+        A DataFrame with one row per group and the columns `by` and `col`.
+    """
+    counts = df.groupby([by, col], observed=True, sort=False).size().reset_index(name='_count')
+    counts = counts.sort_values(['_count', col], ascending=[False, True])
+
+    return counts.drop_duplicates(by, keep='first').drop(columns='_count')
+
+
+def _group_means(df: pd.DataFrame, by: str, cols: list[str]) -> pd.DataFrame:
+    """
+    Computes the mean of several float columns per group with `np.bincount` on the group codes.
+
+    The keys are factorized once and shared by every column, so each mean is one weighted count
+    over a flat array instead of a pass through pandas' groupby machinery. Missing values are
+    skipped and rows with a missing key are dropped, matching `groupby(by).mean()`.
+
+    Args:
+        df: The input DataFrame.
+        by: The column to group by.
+        cols: The float columns whose means are computed.
+
+    Returns:
+        A DataFrame with one row per group, sorted by `by`, and the columns `by` and `cols`.
+    """
+    codes, keys = pd.factorize(df[by], sort=True)
+    has_key = codes >= 0
+    n_groups = len(keys)
+
+    # Group sizes are counted once and shared by every column without missing values
+    key_codes = codes[has_key]
+    key_counts = np.bincount(key_codes, minlength=n_groups)
 
-    return df_cleaned
+    means = {by: keys}
+    for col in cols:
+        values = df[col].to_numpy(dtype='float64', na_value=np.nan)[has_key]
+        missing = np.isnan(values)
+
+        if missing.any():
+            valid = ~missing
+            sums = np.bincount(key_codes[valid], weights=values[valid], minlength=n_groups)
+            counts = np.bincount(key_codes[valid], minlength=n_groups)
+        else:
+            sums = np.bincount(key_codes, weights=values, minlength=n_groups)
+            counts = key_counts
+
+        # Groups without any value get NaN rather than a division warning
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means[col] = sums / counts
+
+    return pd.DataFrame(means)
+
+
+# --- Datetime Constants ---
+NS_PER_DAY = 86_400_000_000_000
+NAT_INT64 = np.iinfo(np.int64).min
+
+def _parse_datetimes(df: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
+    """
+    Casts the given columns to datetime, turning values that cannot be parsed into NaT.
+
+    Date columns are normally read as timestamps already; they only arrive as text when extraction
+    found malformed values, which are coerced here. Olist timestamps are ISO 8601, so the format hint
+    keeps parsing on the C fast path and `cache` parses each distinct timestamp only once. Columns
+    missing from the DataFrame are skipped.
+
+    Args:
+        df: The input DataFrame.
+        cols: The columns to cast.
+
+    Returns:
+        The DataFrame with the columns cast to datetime.
+    """
+    for col in cols:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], format='ISO8601', errors='coerce', cache=True)
+
+    return df
+
+
+def _days_between(end: pd.Series, start: pd.Series) -> pd.arrays.IntegerArray:
+    """
+    Computes the whole days elapsed between two datetime Series on their raw int64 nanoseconds.
+
+    Equivalent to `(end - start).dt.days` (partial days are floored and NaT produces NaN), but
+    without building an intermediate timedelta Series and going through the `.dt` accessor.
+
+    Args:
+        end: The later datetime Series.
+        start: The earlier datetime Series.
+
+    Returns:
+        A nullable integer array with the day deltas, <NA> where either side is missing.
+    """
+    end_ns = end.to_numpy(dtype='datetime64[ns]').view('i8')
+    start_ns = start.to_numpy(dtype='datetime64[ns]').view('i8')
+
+    missing = (end_ns == NAT_INT64) | (start_ns == NAT_INT64)
+    days = (end_ns - start_ns) // NS_PER_DAY
+
+    return pd.arrays.IntegerArray(days, missing)
+
+
+def _downcast_numerics(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcasts numeric columns to the smallest dtype that holds their values without loss.
+
+    Integer columns (including nullable ones) are downcast by value range. Float columns only
+    become float32 when every value is exactly representable (e.g. whole-number measurements);
+    coordinates and prices keep float64 so no precision is lost before loading.
+
+    Args:
+        df: The input DataFrame.
+
+    Returns:
+        The DataFrame with downcast numeric columns.
+    """
+    for col, dtype in df.dtypes.items():
+        if pd.api.types.is_integer_dtype(dtype):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        elif pd.api.types.is_float_dtype(dtype) and dtype != np.float32:
+            values = df[col].to_numpy()
+            downcast = values.astype(np.float32)
+            if np.array_equal(downcast, values, equal_nan=True):
+                df[col] = downcast
+
+    return df
 
 
 # --- Category Dtype Optimization Constants ---
 MAX_UNIQUE_RATIO = 0.5
 MAX_UNIQUE_COUNT = 50_000
+# Memory-intensive dtypes worth converting; 'string' covers Arrow-backed 'string[pyarrow]'.
+# Columns that are already 'category' (e.g. dictionary-encoded on read) are never re-encoded.
+CATEGORY_CANDIDATE_DTYPES = ['object', 'string', 'int64', 'int32', 'float64']
+
+# --- Known Category Constants ---
+# Brazilian federative units (26 states and the Federal District), lowercase as produced by the cleaning.
+BR_STATES = pd.CategoricalDtype(pd.Index(sorted([
+    'ac', 'al', 'am', 'ap', 'ba', 'ce', 'df', 'es', 'go', 'ma', 'mg', 'ms', 'mt', 'pa',
+    'pb', 'pe', 'pi', 'pr', 'rj', 'rn', 'ro', 'rr', 'rs', 'sc', 'se', 'sp', 'to',
+]), dtype=ARROW_STRING_DTYPE))
 
 def _set_category_type(df: pd.DataFrame) -> pd.DataFrame:
     """
     Set 'category' as dtype for columns that passed a test.
 
+    Each candidate column is factorized once: the unique values drive the cardinality check and
+    the codes build the categorical directly, instead of hashing the column a second time in
+    `astype('category')`.
+
     Args:
         df: The input DataFrame.
 
     Returns:
         The DataFrame with columns converted to 'category' where thresholds were met.
     """
-    for col in df.columns:
-        if _should_convert_to_category(df[col], MAX_UNIQUE_RATIO, MAX_UNIQUE_COUNT):
-            df[col] = df[col].astype('category')
+    # Candidates are picked from the dtypes alone, so other columns are never touched
+    candidates = [col for col, dtype in df.dtypes.items() if dtype.name in CATEGORY_CANDIDATE_DTYPES]
+
+    for col in candidates:
+        series = df[col]
+        if _prefix_exceeds_category_thresholds(series):
+            continue
+
+        # Sorted categories, as astype('category') would produce
+        codes, uniques = pd.factorize(series, sort=True)
+        if _within_category_thresholds(len(uniques), len(series)):
+            df[col] = pd.Categorical.from_codes(codes, categories=uniques)
 
     return df
 
 
-def _should_convert_to_category(
+def _set_known_categories(series: pd.Series, dtype: pd.CategoricalDtype) -> pd.Series:
+    """
+    Stores a column with a predefined categorical dtype instead of categories inferred from the data.
+
+    Only the categories are remapped, so no per-row hashing or sorting of the column is needed, and
+    every table using the dtype shares the same codes. If the column holds a value outside the known
+    categories it is returned as an inferred categorical instead, so no value is lost.
+
+    Args:
+        series: The Series to convert, categorical or not.
+        dtype: The categorical dtype with the known categories.
+
+    Returns:
+        The categorical Series, using `dtype` when all its values are known.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+
+    if not series.cat.categories.isin(dtype.categories).all():
+        return series
+
+    return series.cat.set_categories(dtype.categories)
+
+
+def _within_category_thresholds(
+        n_unique: int,
+        n_rows: int,
+        max_ratio: float = MAX_UNIQUE_RATIO,
+        max_count: int = MAX_UNIQUE_COUNT
+) -> bool:
+    """
+    Checks a column's cardinality against the 'category' conversion thresholds.
+
+    Args:
+        n_unique: The number of unique non-null values in the column.
+        n_rows: The number of rows in the column.
+        max_ratio: The maximum allowable ratio of unique values to total rows.
+        max_count: The maximum allowable number of unique values.
+
+    Returns:
+        True if both thresholds are met, False otherwise.
+    """
+    if n_rows == 0:
+        return False
+
+    unique_ratio = n_unique / n_rows
+
+    return unique_ratio <= max_ratio and n_unique <= max_count
+
+
+def _prefix_exceeds_category_thresholds(
         series: pd.Series,
         max_ratio: float = MAX_UNIQUE_RATIO,
         max_count: int = MAX_UNIQUE_COUNT
 ) -> bool:
     """
-    Determines if a panda Series should be converted to the 'category' dtype based on memory
-    efficiency and cardinality thresholds.
+    Cheaply rejects high-cardinality columns before hashing them in full.
 
-    A column is suitable if its dtype is memory-intensive (object/int64) AND its unique value
-    count is below defined thresholds.
+    A column may hold at most `min(max_ratio * n_rows, max_count)` unique values. If a prefix one
+    row longer than that limit already has more, the whole column fails too, so identifier-like
+    columns are rejected after hashing only part of their rows. The check never rejects a column
+    that would pass the full test.
 
     Args:
         series: The panda Series to check.
@@ -85,24 +421,14 @@ def _should_convert_to_category(
         max_count: The maximum allowable number of unique values.
 
     Returns:
-        True if conversion to 'category' is recommended, False otherwise.
+        True if the column certainly fails the thresholds, False if a full check is needed.
     """
-
-    # 1. Dtype check: Only target memory-intensive dtypes for conversion
-    if series.dtype.name not in ['object', 'int64', 'int32', 'float64']:
-        return False
-
-    # 2. Cardinality check: Calculate unique counts and ratio
-    n_unique = series.nunique(dropna=True)
     n_rows = len(series)
+    limit = min(int(max_ratio * n_rows), max_count)
+    sample_size = limit + 1
 
-    if n_rows == 0:
+    # The prefix would be the whole column, so the full check is just as cheap
+    if sample_size >= n_rows:
         return False
 
-    unique_ratio = n_unique / n_rows
-
-    # 3. Apply Thresholds
-    if unique_ratio <= max_ratio and n_unique <= max_count:
-        return True
-
-    return False
\ No newline at end of file
+    return series.iloc[:sample_size].nunique(dropna=True) > limit